@@ -9,14 +9,50 @@ Bitfinex stats history goes back ~3-3.5 years max → cap at 3 pages.
 For 5Y/ALL: price chart is trimmed to match stats range.
 """
 
+import asyncio
+import gzip
+import hashlib
+import http.client
 import json
 import os
+import random
+import threading
 import time
-import urllib.request
+import urllib.error
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-
-BASE_URL = "https://api-pub.bitfinex.com/v2"
+from itertools import chain
+from operator import itemgetter
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to compact stdlib json
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+try:
+    import ijson  # optional: stream-parse arrays instead of buffering the body
+except ImportError:
+    ijson = None
+
+try:
+    import zstandard  # optional: also write a compressed copy of each period
+except ImportError:
+    zstandard = None
+
+API_HOST = "api-pub.bitfinex.com"
+BASE_URL = f"https://{API_HOST}/v2"
+HEADERS = {"User-Agent": "HerdVibe-Collector/1.0"}
 DATA_DIR = "data"
+CACHE_DIR = os.path.join(DATA_DIR, "_cache")
 
 COINS = {
     "btc": "tBTCUSD",
@@ -33,28 +69,197 @@ PERIODS = {
     "3y":   (1095,  "1D",  3),
 }
 
-RATE_LIMIT_DELAY = 2.5
-
+ZSTD_LEVEL = 10
 
-def fetch_json(url, retries=3):
-    for attempt in range(retries):
+RATE_LIMIT_DELAY = 2.5
+MAX_CONCURRENCY = 4
+MAX_BACKOFF = 60
+# Pause until the window resets once the API reports this few calls left
+RATE_LIMIT_MIN_REMAINING = 2
+
+# Requests run concurrently but start at least RATE_LIMIT_DELAY apart,
+# and none start before _resume_at (pushed forward by 429s and low quota).
+# The semaphore is created per event loop in collect_all.
+_semaphore = None
+_last_call_time = float("-inf")
+_resume_at = float("-inf")
+
+
+async def rate_limit():
+    """Reserve the next request slot and sleep until it arrives."""
+    global _last_call_time
+    loop = asyncio.get_running_loop()
+    slot = None
+    while True:
+        now = loop.time()
+        if slot is None or slot < _resume_at:
+            # First pass, or a deferral landed after our slot: take a new one
+            slot = max(now, _last_call_time + RATE_LIMIT_DELAY, _resume_at)
+            _last_call_time = slot
+        if now >= slot:
+            return
+        await asyncio.sleep(slot - now)
+
+
+def defer_requests(seconds):
+    """Hold back every request that has not started yet for `seconds`."""
+    global _resume_at
+    _resume_at = max(_resume_at, asyncio.get_running_loop().time() + seconds)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Honour Retry-After when given, else exponential backoff with jitter."""
+    if retry_after is not None:
         try:
-            req = urllib.request.Request(url, headers={"User-Agent": "HerdVibe-Collector/1.0"})
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                return json.loads(resp.read().decode())
-        except Exception as e:
-            print(f"  Attempt {attempt+1} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(5)
+            return float(retry_after) + random.uniform(0, 0.5)
+        except ValueError:
+            pass  # HTTP-date form; fall through to exponential backoff
+    return min(MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1)
+
+
+def throttle_from_headers(headers):
+    """Back off before the quota runs out if the API reports rate-limit info."""
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    try:
+        remaining, reset = int(remaining), float(reset)
+    except ValueError:
+        return
+    if remaining > RATE_LIMIT_MIN_REMAINING:
+        return
+    if reset > 1e9:  # epoch seconds rather than seconds-until-reset
+        reset -= time.time()
+    if reset > 0:
+        print(f"  Rate limit nearly exhausted ({remaining} left), pausing {reset:.1f}s")
+        defer_requests(min(reset, MAX_BACKOFF))
+
+
+# One keep-alive connection per worker thread, so only the first request
+# on each thread pays for the TCP + TLS handshake.
+_local = threading.local()
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = http.client.HTTPSConnection(API_HOST, timeout=30)
+        _local.conn = conn
+    return conn
+
+
+def _get(url, etag=None):
+    """
+    Send a GET; return (body stream, headers) or raise HTTPError.
+    With `etag`, the request is conditional and the body is None on
+    304 Not Modified.
+    """
+    headers = {**HEADERS, "Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+    parts = urlsplit(url)
+    conn = _connection()
+    try:
+        conn.request("GET", f"{parts.path}?{parts.query}", headers=headers)
+        resp = conn.getresponse()
+        if resp.status != 200:
+            resp.read()
+    except (http.client.HTTPException, OSError):
+        # Drop the broken socket; the next request reconnects
+        conn.close()
+        raise
+    if resp.status == 304:
+        return None, resp.headers
+    if resp.status != 200:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    if resp.getheader("Content-Encoding") == "gzip":
+        # Inflate while reading, so the body still streams
+        return gzip.GzipFile(fileobj=resp), resp.headers
+    return resp, resp.headers
+
+
+def fetch_array(url, start_ms=None, project=None, min_width=2, etag=None):
+    """
+    Fetch a JSON array of [mts, ...] rows; return (rows, headers).
+    With ijson installed, rows are parsed straight off the socket.
+    Rows older than start_ms are dropped and `project` is applied per row
+    while parsing, so discarded fields never end up in the result.
+    rows is None if `etag` is given and the server answers 304.
+    """
+    body, headers = _get(url, etag)
+    if body is None:
+        return None, headers
+    try:
+        if ijson is not None:
+            rows = ijson.items(body, "item", use_float=True)
+        else:
+            rows = _loads(body.read())
+            if not isinstance(rows, list):
+                rows = []
+        rows = iter(rows)
+        first = next(rows, None)
+        # Rows are uniform, so check the shape once instead of on every row
+        if isinstance(first, list) and len(first) >= min_width:
+            rows = chain((first,), rows)
+            if start_ms is not None:
+                rows = (row for row in rows if row[0] >= start_ms)
+            if project is not None:
+                rows = map(project, rows)
+            data = list(rows)
+        else:
+            data = []
+        body.read()  # drain the body so the connection can be reused
+    except Exception:
+        _connection().close()
+        raise
+    return data, headers
+
+
+def fetch_array_if_changed(url, etag, *args):
+    """Conditional fetch_array whose result is (rows or None, new ETag)."""
+    rows, headers = fetch_array(url, *args, etag=etag)
+    return (rows, headers.get("ETag")), headers
+
+
+async def fetch_async(fetch, *args, retries=3):
+    """Run a blocking fetch(*args) in a worker thread, rate limited, with retries."""
+    for attempt in range(retries):
+        delay = None
+        async with _semaphore:
+            await rate_limit()
+            try:
+                data, headers = await asyncio.to_thread(fetch, *args)
+                throttle_from_headers(headers)
+                return data
+            except urllib.error.HTTPError as e:
+                print(f"  Attempt {attempt+1} failed: {e}")
+                if e.code == 429:
+                    # Rate limited: hold back every request, not just this one
+                    defer_requests(backoff_delay(attempt, e.headers.get("Retry-After")))
+                else:
+                    delay = backoff_delay(attempt)
+            except Exception as e:
+                print(f"  Attempt {attempt+1} failed: {e}")
+                delay = backoff_delay(attempt)
+        if delay is not None and attempt < retries - 1:
+            await asyncio.sleep(delay)
     return []
 
 
-def fetch_position_paged(symbol, side, start_ms, max_pages=1):
+def to_columns(rows):
+    """Split [mts, value] rows into (int64 timestamps, float64 values) arrays."""
+    return array("q", map(itemgetter(0), rows)), array("d", map(itemgetter(1), rows))
+
+
+async def fetch_position_paged(symbol, side, start_ms, max_pages=1):
     """
     Fetch margin position data with pagination using 1h timeframe.
     Each page: 10000 × 1h = 416 days. Paginates backwards from now.
+    Returns ascending (timestamps, values) columns.
     """
-    all_data = []
+    pages = []
+    total = 0
     cursor = int(time.time() * 1000)
 
     for page in range(max_pages):
@@ -65,53 +270,133 @@ def fetch_position_paged(symbol, side, start_ms, max_pages=1):
         if page == 0:
             print(f"  Fetching {symbol} {side} (1h, up to {max_pages} pages)...")
 
-        data = fetch_json(url)
-        time.sleep(RATE_LIMIT_DELAY)
+        data = await fetch_async(fetch_array, url, start_ms)
 
         if not isinstance(data, list) or not data:
             break
 
-        all_data.extend(data)
-
         oldest_ts = data[-1][0]
         cursor = oldest_ts - 1
 
+        # Pages arrive newest-first over disjoint ranges: flip each one and
+        # concatenate in reverse to get ascending order without a sort
+        data.reverse()
+        pages.append(data)
+        total += len(data)
+
         if cursor <= start_ms or len(data) < 10000:
             break
 
         if page > 0:
-            print(f"    ...page {page+1}, {len(all_data)} points so far")
+            print(f"    ...page {page+1}, {total} points so far")
 
-    all_data.sort(key=lambda x: x[0])
+    # Sorted, so duplicate timestamps are adjacent
+    ts, values = array("q"), array("d")
+    prev = None
+    for page in reversed(pages):
+        for row in page:
+            if row[0] != prev:
+                ts.append(row[0])
+                values.append(row[1])
+                prev = row[0]
 
-    seen = set()
-    deduped = []
-    for item in all_data:
-        ts = item[0]
-        if ts not in seen:
-            seen.add(ts)
-            deduped.append(item)
+    print(f"  {side.capitalize()}: {len(ts)} data points")
+    return ts, values
 
-    print(f"  {side.capitalize()}: {len(deduped)} data points")
-    return deduped
 
+# [MTS, OPEN, CLOSE, HIGH, LOW, VOLUME] -> (MTS, CLOSE), projected in C
+_candle_price = itemgetter(0, 2)
 
-def fetch_candle_data(symbol, timeframe, start_ms):
-    url = (
-        f"{BASE_URL}/candles/trade:{timeframe}:{symbol}/hist"
-        f"?limit=10000&start={start_ms}&sort=-1"
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+
+def load_cache(key):
+    try:
+        with open(_cache_path(key), "rb") as f:
+            return _loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(key, entry):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(_cache_path(key), "wb") as f:
+        f.write(_dumps(entry))
+
+
+async def fetch_candles_as_price(symbol, timeframe, start_ms):
+    """
+    Fetch (mts, close) candle columns since start_ms.
+    Price history is cached between runs, so only bars from the last cached
+    one onwards (it may still have been forming) are requested and merged
+    into the cache. The ETag is stored with the exact URL that returned it
+    and only sent as If-None-Match when the same URL is requested again.
+    """
+    endpoint = f"{BASE_URL}/candles/trade:{timeframe}:{symbol}/hist"
+    cached = load_cache(endpoint)
+    if cached and cached["rows"] and cached["start"] <= start_ms:
+        cached_rows = cached["rows"]
+        fetch_from = max(start_ms, cached_rows[-1][0])
+    else:
+        cached_rows, fetch_from = [], start_ms
+
+    # Ascending order needs no reverse; every period's window is well under
+    # 10000 candles, so the oldest-first page still reaches the latest bar
+    url = f"{endpoint}?limit=10000&start={fetch_from}&sort=1"
+    etag = cached.get("etag") if cached_rows and cached.get("etag_url") == url else None
+    print(f"  Fetching {symbol} candles ({timeframe}, from {'cache tail' if cached_rows else 'start'})...")
+    result = await fetch_async(fetch_array_if_changed, url, etag, fetch_from, _candle_price, 3)
+
+    if not result:  # request failed; serve the cached history
+        rows = cached_rows
+    elif not result[0]:  # 304 Not Modified, or an empty/malformed page
+        rows = cached_rows
+    else:
+        new_rows, etag = result
+        keep = bisect_left(cached_rows, fetch_from, key=itemgetter(0))
+        rows = cached_rows[:keep] + new_rows
+        rows = rows[bisect_left(rows, start_ms, key=itemgetter(0)):]
+        save_cache(endpoint, {"start": start_ms, "etag": etag, "etag_url": url, "rows": rows})
+
+    return since(to_columns(rows), start_ms)
+
+
+async def fetch_positions(start_ms, max_pages):
+    """Fetch longs and shorts for every coin concurrently."""
+    symbols = list(COINS.values())
+    results = await asyncio.gather(
+        *[fetch_position_paged(sym, "long", start_ms, max_pages) for sym in symbols],
+        *[fetch_position_paged(sym, "short", start_ms, max_pages) for sym in symbols],
+    )
+    n = len(symbols)
+    return {coin_key: (results[i], results[n + i]) for i, coin_key in enumerate(COINS)}
+
+
+async def fetch_prices(start_ms, candle_tf):
+    """Fetch the price series for every coin concurrently."""
+    results = await asyncio.gather(
+        *[fetch_candles_as_price(sym, candle_tf, start_ms) for sym in COINS.values()]
     )
-    print(f"  Fetching {symbol} candles ({timeframe})...")
-    data = fetch_json(url)
-    time.sleep(RATE_LIMIT_DELAY)
-    return data
+    return dict(zip(COINS, results))
+
 
+def period_start_ms(period_key, now):
+    days_back = PERIODS[period_key][0]
+    return int((now - timedelta(days=days_back)).timestamp() * 1000)
 
-def collect_period(period_key):
+
+def since(series, start_ms):
+    """Slice ascending (timestamps, values) columns to start_ms onwards."""
+    ts, values = series
+    i = bisect_left(ts, start_ms)
+    return ts[i:], values[i:]
+
+
+def collect_period(period_key, now, positions, prices):
     days_back, candle_tf, max_pages = PERIODS[period_key]
-    now = datetime.now(timezone.utc)
-    start = now - timedelta(days=days_back)
-    start_ms = int(start.timestamp() * 1000)
+    start_ms = period_start_ms(period_key, now)
 
     print(f"\n{'='*50}")
     print(f"Collecting {period_key} (last {days_back} days, candle={candle_tf}, stat_pages={max_pages})")
@@ -122,32 +407,24 @@ def collect_period(period_key):
     for coin_key, symbol in COINS.items():
         print(f"\n--- {coin_key.upper()} ({symbol}) ---")
 
-        longs = fetch_position_paged(symbol, "long", start_ms, max_pages)
-        shorts = fetch_position_paged(symbol, "short", start_ms, max_pages)
-
-        candles = fetch_candle_data(symbol, candle_tf, start_ms)
-        if isinstance(candles, list):
-            candles.reverse()
-        print(f"  Candles: {len(candles) if isinstance(candles, list) else 0} data points")
-
-        price_data = []
-        for c in candles:
-            if isinstance(c, list) and len(c) >= 3:
-                price_data.append([c[0], c[2]])
+        longs, shorts = (since(series, start_ms) for series in positions[coin_key])
+        price_data = prices[coin_key]
+        long_ts, short_ts = longs[0], shorts[0]
+        print(f"  Longs: {len(long_ts)}, Shorts: {len(short_ts)}, Candles: {len(price_data[0])} data points")
 
         # SYNC: trim price to match stats time range
         stats_start = None
-        if longs:
-            stats_start = longs[0][0]
-        if shorts and (stats_start is None or shorts[0][0] < stats_start):
-            stats_start = shorts[0][0]
-
-        if stats_start is not None and price_data:
-            original_len = len(price_data)
-            price_data = [p for p in price_data if p[0] >= stats_start]
-            if not price_data:  # fallback if trimming removed everything
-                price_data = [[c[0], c[2]] for c in candles if isinstance(c, list) and len(c) >= 3]
-            trimmed = original_len - len(price_data)
+        if long_ts:
+            stats_start = long_ts[0]
+        if short_ts and (stats_start is None or short_ts[0] < stats_start):
+            stats_start = short_ts[0]
+
+        if stats_start is not None and price_data[0]:
+            original_len = len(price_data[0])
+            trimmed_data = since(price_data, stats_start)
+            if trimmed_data[0]:  # keep the full series if trimming removed everything
+                price_data = trimmed_data
+            trimmed = original_len - len(price_data[0])
             if trimmed > 0:
                 print(f"  Price trimmed: {trimmed} points removed to match stats range")
 
@@ -160,30 +437,127 @@ def collect_period(period_key):
     return result
 
 
-def downsample(data, max_points=2500):
-    if not data or len(data) <= max_points:
-        return data
-    step = (len(data) - 1) / (max_points - 1)
-    result = [data[int(i * step)] for i in range(max_points - 1)]
-    result.append(data[-1])
-    return result
+async def collect_all():
+    """
+    Collect every period concurrently behind the shared rate limiter.
+    Position stats are 1h for every period, so they are fetched once for the
+    widest window and sliced for the narrower ones; only candles differ.
+    """
+    global _semaphore
+    _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    # A fixed pool sized to the semaphore keeps each request on one of
+    # MAX_CONCURRENCY long-lived threads, and so on their keep-alive
+    # connections; asyncio.run shuts it down on exit.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="fetch")
+    )
+    now = datetime.now(timezone.utc)
+    widest = max(PERIODS, key=lambda k: PERIODS[k][0])
+
+    positions, *prices = await asyncio.gather(
+        fetch_positions(period_start_ms(widest, now), PERIODS[widest][2]),
+        *[fetch_prices(period_start_ms(p, now), PERIODS[p][1]) for p in PERIODS],
+    )
+    return [
+        collect_period(p, now, positions, period_prices)
+        for p, period_prices in zip(PERIODS, prices)
+    ]
+
+
+def _downsample_indices(n, max_points):
+    """
+    Yield max_points evenly spaced indices into n items, ending at n - 1.
+    Bresenham-style integer stepping picks floor(i * (n-1) / (max_points-1))
+    without any float multiply or truncation per index.
+    """
+    steps = max_points - 1
+    stride, rem = divmod(n - 1, steps)
+    j = err = 0
+    for _ in range(steps):
+        yield j
+        j += stride
+        err += rem
+        if err >= steps:
+            j += 1
+            err -= steps
+    yield n - 1
+
+
+def sample_indices(n, max_points=2500):
+    """Indices of the points kept when n points are downsampled to max_points."""
+    if n <= max_points:
+        return range(n)
+    return _downsample_indices(n, max_points)
+
+
+def dump_downsampled(buf, data, max_points=2500):
+    """
+    Append the downsampled points of `data` to `buf` as a JSON array.
+    The sampled column is gathered into one short-lived list and serialized
+    with a single _dumps call; one call per element would skip that list
+    but costs about twice the CPU.
+    """
+    buf += _dumps(list(map(data.__getitem__, sample_indices(len(data), max_points))))
 
 
 def save_period(period_key, data):
+    # Columnar {"t": [...], "v": [...]} per series instead of [t, v] pairs,
+    # assembled in one buffer and written once
+    buf = bytearray(_dumps({"updated_at": data["updated_at"], "period": data["period"]}))
     for coin_key in COINS:
-        if coin_key in data:
-            coin = data[coin_key]
-            coin["longs"] = downsample(coin["longs"], 2500)
-            coin["shorts"] = downsample(coin["shorts"], 2500)
-            coin["price"] = downsample(coin["price"], 2500)
+        if coin_key not in data:
+            continue
+        buf[-1:] = b","  # reopen the enclosing object
+        buf += _dumps(coin_key) + b":{"
+        for series, (ts, values) in data[coin_key].items():
+            buf += _dumps(series) + b':{"t":'
+            dump_downsampled(buf, ts)
+            buf += b',"v":'
+            dump_downsampled(buf, values)
+            buf += b"},"
+        buf[-1:] = b"}}"
 
     filepath = os.path.join(DATA_DIR, f"{period_key}.json")
-    with open(filepath, "w") as f:
-        json.dump(data, f, separators=(",", ":"))
+    with open(filepath, "wb") as f:
+        f.write(buf)
 
     size_kb = os.path.getsize(filepath) / 1024
     print(f"\nSaved {filepath} ({size_kb:.1f} KB)")
 
+    # The dashboard still reads plain JSON; the .zst copy is for storage/transport
+    if zstandard is not None:
+        cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, write_content_size=True)
+        with open(filepath + ".zst", "wb") as f:
+            f.write(cctx.compress(buf))
+        size_kb = os.path.getsize(filepath + ".zst") / 1024
+        print(f"Saved {filepath}.zst ({size_kb:.1f} KB)")
+
+    save_period_ndjson(period_key, data)
+
+
+def save_period_ndjson(period_key, data):
+    """
+    Write data/<period>.ndjson: a {"meta": ...} header line, then for each
+    series a {"c": coin, "s": series, "n": count} line followed by `count`
+    bare [mts, value] lines, so consumers can stream the file or skip whole
+    series instead of parsing all of it. Samples are the same downsampled
+    points as in the JSON file.
+    """
+    filepath = os.path.join(DATA_DIR, f"{period_key}.ndjson")
+    meta = {"period": period_key, "updated_at": data["updated_at"]}
+    with open(filepath, "wb") as f:
+        f.write(_dumps({"meta": meta}) + b"\n")
+        for coin_key in COINS:
+            if coin_key not in data:
+                continue
+            for series, (ts, values) in data[coin_key].items():
+                indices = list(sample_indices(len(ts)))
+                f.write(_dumps({"c": coin_key, "s": series, "n": len(indices)}) + b"\n")
+                f.writelines(_dumps([ts[j], values[j]]) + b"\n" for j in indices)
+
+    size_kb = os.path.getsize(filepath) / 1024
+    print(f"Saved {filepath} ({size_kb:.1f} KB)")
+
 
 def main():
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -192,8 +566,8 @@ def main():
     print(f"Started at: {datetime.now(timezone.utc).isoformat()}")
     print(f"Coins: {', '.join(c.upper() for c in COINS)}")
 
-    for period_key in PERIODS:
-        data = collect_period(period_key)
+    results = asyncio.run(collect_all())
+    for period_key, data in zip(PERIODS, results):
         save_period(period_key, data)
 
     meta = {